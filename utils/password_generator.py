@@ -12,21 +12,270 @@ Author: ishan
 License: MIT
 """
 
-import argparse
+import functools
+import os
 import secrets
 import string
-from typing import List, Set
+import sys
+from typing import Callable, List
+
+# Bit flags for the character classes in the strength lookup table
+LOWERCASE_BIT = 1
+UPPERCASE_BIT = 2
+DIGIT_BIT = 4
+SYMBOL_BIT = 8
+
+# Batches at least this large are split across worker processes
+PARALLEL_THRESHOLD = 200_000
+
+
+def _build_class_table(*classes) -> bytes:
+    """Build a 256-byte table mapping each byte of (chars, bit) pairs to its bits."""
+    table = bytearray(256)
+    for chars, bit in classes:
+        for b in chars.encode('ascii'):
+            # A character may belong to more than one class
+            table[b] |= bit
+    return bytes(table)
+
+
+def _or_bits(values: bytes) -> int:
+    """Return the OR of every byte value in values."""
+    mask = 0
+    for bits in set(values):
+        mask |= bits
+    return mask
+
+
+def _combined_mask(data: bytes, table: bytes) -> int:
+    """Return the OR of table[b] over every byte b in data."""
+    return _or_bits(data.translate(table))
+
+
+def _generate_chunk(generator: "PasswordGenerator", count: int, options: dict) -> List[str]:
+    """Worker entry point for parallel batch generation."""
+    return generator._generate_batch(count, **options)
 
 
 class PasswordGenerator:
     """A secure password generator with customizable options."""
     
+    lowercase = string.ascii_lowercase
+    uppercase = string.ascii_uppercase
+    digits = string.digits
+    symbols = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+    ambiguous_chars = "0O1lI|`'\""
+    
+    # Strips the two non-alphanumeric characters from token_urlsafe output
+    _urlsafe_strip = str.maketrans('', '', '-_')
+    
     def __init__(self):
-        self.lowercase = string.ascii_lowercase
-        self.uppercase = string.ascii_uppercase
-        self.digits = string.digits
-        self.symbols = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-        self.ambiguous_chars = "0O1lI|`'\""
+        # Character set attributes the derived tables below were built from
+        self._alphabet = None
+        
+        # (char_set, type_slices) keyed by a bitmask of the selection flags
+        self._char_set_cache = {}
+        
+        # (translate table, rejected bytes) keyed by character set
+        self._byte_map_cache = {}
+        
+        # Byte -> selected-type bits tables keyed by (char_set, type_slices)
+        self._type_table_cache = {}
+        
+        # Specialized generate(length) functions keyed by option flags
+        self._specialized = {}
+        
+        self._sync_alphabet()
+    
+    def __getstate__(self) -> dict:
+        # Specialized closures cannot be pickled; workers rebuild them on demand
+        state = self.__dict__.copy()
+        state["_specialized"] = {}
+        return state
+    
+    def _sync_alphabet(self) -> None:
+        """
+        Rebuild derived tables if a character set attribute has changed.
+        
+        The character sets may be overridden by subclasses or on an instance,
+        so the derived data is built from the current values, not at import.
+        """
+        alphabet = (self.lowercase, self.uppercase, self.digits,
+                    self.symbols, self.ambiguous_chars)
+        if alphabet == self._alphabet:
+            return
+        
+        self._alphabet = alphabet
+        self._char_set_cache.clear()
+        self._type_table_cache.clear()
+        self._specialized.clear()
+        
+        # Ambiguous-free pools
+        strip_ambiguous = str.maketrans('', '', self.ambiguous_chars)
+        self.lowercase_clean = self.lowercase.translate(strip_ambiguous)
+        self.uppercase_clean = self.uppercase.translate(strip_ambiguous)
+        self.digits_clean = self.digits.translate(strip_ambiguous)
+        self.symbols_clean = self.symbols.translate(strip_ambiguous)
+        
+        classes = ((self.lowercase, LOWERCASE_BIT), (self.uppercase, UPPERCASE_BIT),
+                   (self.digits, DIGIT_BIT), (self.symbols, SYMBOL_BIT))
+        if all(chars.isascii() for chars, _ in classes):
+            # 256-entry table mapping each byte to its character class bits
+            self._class_table = _build_class_table(*classes)
+            self._class_sets = None
+        else:
+            # Non-ASCII sets cannot use the byte table; fall back to set lookups
+            self._class_table = None
+            self._class_sets = tuple((frozenset(chars), bit) for chars, bit in classes)
+    
+    def _get_char_set(
+        self,
+        include_lowercase: bool,
+        include_uppercase: bool,
+        include_digits: bool,
+        include_symbols: bool,
+        exclude_ambiguous: bool
+    ) -> tuple:
+        """
+        Return the (char_set, type_slices) pair for the given flags, cached.
+        
+        type_slices holds one (start, end) offset pair into char_set per
+        selected character type.
+        """
+        key = (include_lowercase | include_uppercase << 1 | include_digits << 2
+               | include_symbols << 3 | exclude_ambiguous << 4)
+        cached = self._char_set_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        parts = []
+        type_slices = []
+        offset = 0
+        for included, chars, clean_chars in (
+            (include_lowercase, self.lowercase, self.lowercase_clean),
+            (include_uppercase, self.uppercase, self.uppercase_clean),
+            (include_digits, self.digits, self.digits_clean),
+            (include_symbols, self.symbols, self.symbols_clean),
+        ):
+            if included:
+                chars = clean_chars if exclude_ambiguous else chars
+                parts.append(chars)
+                type_slices.append((offset, offset + len(chars)))
+                offset += len(chars)
+        
+        cached = (''.join(parts), tuple(type_slices))
+        self._char_set_cache[key] = cached
+        return cached
+    
+    def _get_byte_map(self, char_set: str) -> tuple:
+        """
+        Return a translation table mapping random bytes onto char_set.
+        
+        Bytes at or above the largest multiple of len(char_set) are rejected
+        so every character is equally likely (no modulo bias).
+        """
+        cached = self._byte_map_cache.get(char_set)
+        if cached is not None:
+            return cached
+        
+        pool = char_set.encode('ascii')
+        pool_len = len(pool)
+        cutoff = 256 - (256 % pool_len)
+        table = bytes(pool[b % pool_len] for b in range(cutoff)) + bytes(256 - cutoff)
+        cached = (table, bytes(range(cutoff, 256)))
+        self._byte_map_cache[char_set] = cached
+        return cached
+    
+    def _get_type_table(self, char_set: str, type_slices: tuple) -> tuple:
+        """
+        Return (table, required, type_bits) for checking selected types.
+        
+        table maps each char_set byte to its type bits: bit i is set for bytes
+        in the i-th type slice. A password contains every selected type when
+        the OR of its translated bytes equals required. When no byte belongs
+        to more than one type, type_bits is the frozenset of single bits and
+        the check reduces to type_bits being a subset of the translated bytes;
+        otherwise it is None.
+        """
+        key = (char_set, type_slices)
+        cached = self._type_table_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        table = bytearray(256)
+        pool = char_set.encode('ascii')
+        for i, (start, end) in enumerate(type_slices):
+            for b in pool[start:end]:
+                table[b] |= 1 << i
+        
+        required = (1 << len(type_slices)) - 1
+        type_bits = frozenset(1 << i for i in range(len(type_slices)))
+        if any(bits & (bits - 1) for bits in table):
+            type_bits = None
+        cached = (bytes(table), required, type_bits)
+        self._type_table_cache[key] = cached
+        return cached
+    
+    def _class_mask(self, password: str) -> int:
+        """Return the OR of the class bits of every character in password."""
+        if self._class_table is None:
+            chars = set(password)
+            mask = 0
+            for class_chars, bit in self._class_sets:
+                if not class_chars.isdisjoint(chars):
+                    mask |= bit
+            return mask
+        # Non-ASCII characters belong to no class, so they can be dropped
+        return _combined_mask(password.encode('ascii', 'ignore'), self._class_table)
+    
+    def _random_bytes(self, char_set: str, count: int) -> bytes:
+        """Draw count ASCII characters uniformly from char_set using bulk entropy."""
+        table, rejected = self._get_byte_map(char_set)
+        parts = []
+        drawn = 0
+        while drawn < count:
+            need = count - drawn
+            # Over-draw slightly so rejections rarely need a second round
+            part = secrets.token_bytes(need + need // 4 + 1).translate(table, rejected)
+            parts.append(part)
+            drawn += len(part)
+        return b''.join(parts)[:count]
+    
+    def _check_length(self, length: int) -> None:
+        """Validate the requested password length."""
+        # At most four types can be selected, so this also leaves room for
+        # one character of each type
+        if length < 4:
+            raise ValueError("Password length must be at least 4 characters")
+    
+    def _resolve_char_set(
+        self,
+        include_lowercase: bool,
+        include_uppercase: bool,
+        include_digits: bool,
+        include_symbols: bool,
+        exclude_ambiguous: bool
+    ) -> tuple:
+        """Validate character set options and return (char_set, type_slices)."""
+        # Build character set
+        char_set, type_slices = self._get_char_set(
+            bool(include_lowercase), bool(include_uppercase), bool(include_digits),
+            bool(include_symbols), bool(exclude_ambiguous)
+        )
+        
+        if not char_set:
+            raise ValueError("At least one character type must be included")
+        
+        # Sampling works on bytes, so the selected sets must be ASCII
+        if not char_set.isascii():
+            raise ValueError("Character sets must contain only ASCII characters")
+        
+        # A selected type left empty (e.g. by exclude_ambiguous) can never be
+        # satisfied and would make the rejection sampling loop forever
+        if any(start == end for start, end in type_slices):
+            raise ValueError("Each selected character type must have at least one usable character")
+        
+        return char_set, type_slices
     
     def generate_password(
         self,
@@ -56,84 +305,216 @@ class PasswordGenerator:
         Raises:
             ValueError: If invalid parameters are provided
         """
-        if length < 4:
-            raise ValueError("Password length must be at least 4 characters")
+        self._check_length(length)
+        self._sync_alphabet()
+        options = (bool(include_lowercase), bool(include_uppercase), bool(include_digits),
+                   bool(include_symbols), bool(exclude_ambiguous), bool(min_of_each_type))
+        generate = self._specialized.get(options)
+        if generate is None:
+            generate = self._specialize(*options)
+            self._specialized[options] = generate
+        return generate(length)
+    
+    def _specialize(
+        self,
+        include_lowercase: bool,
+        include_uppercase: bool,
+        include_digits: bool,
+        include_symbols: bool,
+        exclude_ambiguous: bool,
+        min_of_each_type: bool
+    ) -> Callable[[int], str]:
+        """
+        Build a generate(length) function with the given options fixed.
         
-        # Build character set
-        char_set = ""
-        selected_types = []
-        
-        if include_lowercase:
-            chars = self.lowercase
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.ambiguous_chars)
-            char_set += chars
-            selected_types.append(chars)
-        
-        if include_uppercase:
-            chars = self.uppercase
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.ambiguous_chars)
-            char_set += chars
-            selected_types.append(chars)
-        
-        if include_digits:
-            chars = self.digits
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.ambiguous_chars)
-            char_set += chars
-            selected_types.append(chars)
-        
-        if include_symbols:
-            chars = self.symbols
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.ambiguous_chars)
-            char_set += chars
-            selected_types.append(chars)
+        The character set options are validated here, once; the caller
+        validates length on every call.
+        """
+        # Fast path: the default alphabet is [A-Za-z0-9], which is exactly
+        # token_urlsafe's alphabet minus '-' and '_'
+        if (include_lowercase and include_uppercase and include_digits
+                and not include_symbols and not exclude_ambiguous
+                and self.lowercase == string.ascii_lowercase
+                and self.uppercase == string.ascii_uppercase
+                and self.digits == string.digits):
+            return functools.partial(self._generate_alphanumeric,
+                                     min_of_each_type=min_of_each_type)
         
-        if not char_set:
-            raise ValueError("At least one character type must be included")
+        char_set, type_slices = self._resolve_char_set(
+            include_lowercase, include_uppercase, include_digits,
+            include_symbols, exclude_ambiguous
+        )
         
-        # Generate password
-        if min_of_each_type and len(selected_types) > 0:
-            if length < len(selected_types):
-                raise ValueError(f"Password length must be at least {len(selected_types)} when ensuring minimum of each type")
-            
-            # Ensure at least one character from each selected type
-            password_chars = []
-            for char_type in selected_types:
-                password_chars.append(secrets.choice(char_type))
+        if not min_of_each_type:
+            # Generate completely random password from character set
+            random_bytes = self._random_bytes
             
-            # Fill remaining length with random characters from full set
-            remaining_length = length - len(selected_types)
-            for _ in range(remaining_length):
-                password_chars.append(secrets.choice(char_set))
+            def generate_any(length: int) -> str:
+                return random_bytes(char_set, length).decode('ascii')
             
-            # Shuffle the password to avoid predictable patterns
-            password_list = list(password_chars)
-            for i in range(len(password_list)):
-                j = secrets.randbelow(len(password_list))
-                password_list[i], password_list[j] = password_list[j], password_list[i]
+            return generate_any
+        
+        # Same rejection sampling as _generate_batch, for a batch of one
+        type_table, required, type_bits = self._get_type_table(char_set, type_slices)
+        sample = self._sample_with_every_type
+        
+        def generate(length: int) -> str:
+            return sample(char_set, type_table, required, type_bits, 1, length)[0]
+        
+        return generate
+    
+    def _generate_alphanumeric(self, length: int, min_of_each_type: bool) -> str:
+        """Generate an [A-Za-z0-9] password from token_urlsafe output."""
+        while True:
+            parts = []
+            drawn = 0
+            while drawn < length:
+                part = secrets.token_urlsafe(length * 2).translate(self._urlsafe_strip)
+                parts.append(part)
+                drawn += len(part)
+            password = ''.join(parts)[:length]
             
-            return ''.join(password_list)
-        else:
-            # Generate completely random password from character set
-            return ''.join(secrets.choice(char_set) for _ in range(length))
+            if not min_of_each_type:
+                return password
+            # Redraw until every class is present; keeps the result uniform
+            required = LOWERCASE_BIT | UPPERCASE_BIT | DIGIT_BIT
+            if self._class_mask(password) & required == required:
+                return password
     
     def generate_multiple_passwords(
         self,
         count: int,
-        **kwargs
+        length: int = 12,
+        include_lowercase: bool = True,
+        include_uppercase: bool = True,
+        include_digits: bool = True,
+        include_symbols: bool = False,
+        exclude_ambiguous: bool = False,
+        min_of_each_type: bool = True
+    ) -> List[str]:
+        """
+        Generate multiple passwords with the same criteria.
+        
+        Batches of at least PARALLEL_THRESHOLD passwords are split across
+        worker processes; results are returned in order.
+        """
+        options = {
+            "length": length,
+            "include_lowercase": include_lowercase,
+            "include_uppercase": include_uppercase,
+            "include_digits": include_digits,
+            "include_symbols": include_symbols,
+            "exclude_ambiguous": exclude_ambiguous,
+            "min_of_each_type": min_of_each_type,
+        }
+        
+        # Validate up front so errors surface here rather than in a worker
+        self._check_length(length)
+        self._sync_alphabet()
+        self._resolve_char_set(include_lowercase, include_uppercase, include_digits,
+                               include_symbols, exclude_ambiguous)
+        
+        workers = os.cpu_count() or 1
+        if count < PARALLEL_THRESHOLD or workers < 2:
+            return self._generate_batch(count, **options)
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        chunk_size, extra = divmod(count, workers)
+        chunks = [chunk_size + (i < extra) for i in range(workers)]
+        passwords = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in executor.map(_generate_chunk, [self] * workers, chunks,
+                                      [options] * workers):
+                passwords.extend(chunk)
+        return passwords
+    
+    def _generate_batch(
+        self,
+        count: int,
+        length: int,
+        include_lowercase: bool,
+        include_uppercase: bool,
+        include_digits: bool,
+        include_symbols: bool,
+        exclude_ambiguous: bool,
+        min_of_each_type: bool
+    ) -> List[str]:
+        """
+        Generate count passwords in the current process.
+        
+        The character set is resolved once and entropy for the whole batch is
+        drawn in bulk from the OS CSPRNG, then sliced into individual passwords.
+        """
+        self._sync_alphabet()
+        char_set, type_slices = self._resolve_char_set(
+            include_lowercase, include_uppercase, include_digits,
+            include_symbols, exclude_ambiguous
+        )
+        
+        if not min_of_each_type:
+            chars = self._random_bytes(char_set, count * length).decode('ascii')
+            return [chars[i:i + length] for i in range(0, count * length, length)]
+        
+        return self._sample_with_every_type(
+            char_set, *self._get_type_table(char_set, type_slices), count, length
+        )
+    
+    def _sample_with_every_type(
+        self,
+        char_set: str,
+        type_table: bytes,
+        required: int,
+        type_bits: frozenset,
+        count: int,
+        length: int
     ) -> List[str]:
-        """Generate multiple passwords with the same criteria."""
-        return [self.generate_password(**kwargs) for _ in range(count)]
+        """
+        Draw count passwords that each contain every selected type.
+        
+        Whole candidate passwords are drawn in bulk and those whose type mask
+        equals required are kept. This avoids a per-password shuffle and keeps
+        the result uniform over all valid passwords.
+        """
+        if type_bits is not None:
+            accept = type_bits.issubset
+        else:
+            def accept(types: bytes) -> bool:
+                return _or_bits(types) == required
+        
+        passwords = []
+        append = passwords.append
+        # Draw at least ~128 bytes of candidates per entropy call so low
+        # acceptance rates (short passwords with many types) rarely need
+        # another round; scanning stops as soon as count passwords are kept
+        draw = max(count, 128 // length)
+        while len(passwords) < count:
+            before = len(passwords)
+            chars = self._random_bytes(char_set, draw * length)
+            types = chars.translate(type_table)
+            for i in range(0, draw * length, length):
+                if accept(types[i:i + length]):
+                    append(chars[i:i + length].decode('ascii'))
+                    if len(passwords) == count:
+                        break
+            # Scale the next draw by the observed acceptance rate, or double
+            # it if nothing was accepted
+            accepted = len(passwords) - before
+            if accepted:
+                draw = (count - len(passwords)) * draw // accepted + 1
+            else:
+                draw *= 2
+        
+        return passwords
     
     def check_password_strength(self, password: str) -> dict:
         """Analyze password strength and return metrics."""
-        has_lower = any(c.islower() for c in password)
-        has_upper = any(c.isupper() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_symbol = any(c in self.symbols for c in password)
+        self._sync_alphabet()
+        mask = self._class_mask(password)
+        has_lower = bool(mask & LOWERCASE_BIT)
+        has_upper = bool(mask & UPPERCASE_BIT)
+        has_digit = bool(mask & DIGIT_BIT)
+        has_symbol = bool(mask & SYMBOL_BIT)
         
         character_types = sum([has_lower, has_upper, has_digit, has_symbol])
         
@@ -163,9 +544,19 @@ class PasswordGenerator:
             "strength": strength,
             "strength_score": strength_score
         }
+    
+    def check_multiple_passwords_strength(self, passwords: List[str]) -> List[dict]:
+        """Analyze the strength of several passwords."""
+        return [self.check_password_strength(password) for password in passwords]
+
+
+# Shared instance so importers and the CLI reuse the same caches
+default_generator = PasswordGenerator()
 
 
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Generate secure passwords")
     parser.add_argument("-l", "--length", type=int, default=12,
                        help="Password length (default: 12)")
@@ -183,12 +574,31 @@ def main():
                        help="Exclude ambiguous characters (0, O, 1, l, I, |, `, ', \")")
     parser.add_argument("--no-min-each", action="store_true",
                        help="Don't ensure minimum of each character type")
-    parser.add_argument("--analyze", type=str,
-                       help="Analyze strength of provided password")
+    analyze_group = parser.add_mutually_exclusive_group()
+    analyze_group.add_argument("--analyze", type=str,
+                               help="Analyze strength of provided password")
+    analyze_group.add_argument("--analyze-file", type=str,
+                               help="Analyze strength of each password in a file (one per line)")
     
     args = parser.parse_args()
     
-    generator = PasswordGenerator()
+    generator = default_generator
+    
+    if args.analyze_file:
+        try:
+            # Undecodable bytes are replaced so non-UTF-8 lists still load
+            with open(args.analyze_file, encoding="utf-8", errors="replace") as f:
+                passwords = [line.rstrip("\r\n") for line in f]
+            passwords = [password for password in passwords if password]
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+        
+        analyses = generator.check_multiple_passwords_strength(passwords)
+        for password, analysis in zip(passwords, analyses):
+            print(f"{analysis['strength']:<9} ({analysis['strength_score']}/5) "
+                  f"{analysis['character_types']}/4 types: {password}")
+        return 0
     
     if args.analyze:
         analysis = generator.check_password_strength(args.analyze)
@@ -216,9 +626,9 @@ def main():
         
         if args.count == 1:
             print(passwords[0])
-        else:
-            for i, password in enumerate(passwords, 1):
-                print(f"{i:2d}: {password}")
+        elif passwords:
+            sys.stdout.write('\n'.join(f"{i:2d}: {password}"
+                                        for i, password in enumerate(passwords, 1)) + '\n')
     
     except ValueError as e:
         print(f"Error: {e}")